@@ -2,13 +2,33 @@ from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 import os
 from dotenv import load_dotenv
 
+try:
+    from .repositories.scenario_repository import ScenarioRepository, MongoScenarioRepository
+    from .repositories.sqlite_repository import SQLiteScenarioRepository
+except ImportError:
+    # Fallback for when running as script
+    from repositories.scenario_repository import ScenarioRepository, MongoScenarioRepository
+    from repositories.sqlite_repository import SQLiteScenarioRepository
+
 load_dotenv()
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-db_name = os.environ['DB_NAME']
-client = AsyncIOMotorClient(mongo_url)
-database = client[db_name]
+# Storage backend: "mongo" (default) or "sqlite" for embedded single-node deployments
+storage_backend = os.environ.get('STORAGE_BACKEND', 'mongo').lower()
+
+client = None
+database = None
+
+if storage_backend == 'mongo':
+    # MongoDB connection
+    mongo_url = os.environ['MONGO_URL']
+    db_name = os.environ['DB_NAME']
+    client = AsyncIOMotorClient(mongo_url)
+    database = client[db_name]
+    repository: ScenarioRepository = MongoScenarioRepository(database)
+elif storage_backend == 'sqlite':
+    repository = SQLiteScenarioRepository(os.environ.get('SQLITE_PATH', 'scenarios.db'))
+else:
+    raise ValueError(f"Unsupported STORAGE_BACKEND: {storage_backend}")
 
 
 async def get_database() -> AsyncIOMotorDatabase:
@@ -16,6 +36,11 @@ async def get_database() -> AsyncIOMotorDatabase:
     return database
 
 
+async def get_repository() -> ScenarioRepository:
+    """Dependency to get the configured scenario repository"""
+    return repository
+
+
 async def close_database_connection():
     """Close database connection"""
-    client.close()
\ No newline at end of file
+    await repository.close()
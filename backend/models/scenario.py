@@ -18,6 +18,12 @@ class Scenario(ScenarioBase):
     mood: str = Field(..., description="The mood of the scenario (chaotic, humorous, dramatic, surreal)")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     session_id: Optional[str] = Field(None, description="Session identifier")
+    model: Optional[str] = Field(None, description="LLM model used to generate the scenario")
+    prompt_tokens: Optional[int] = Field(None, description="Tokens sent to the LLM")
+    completion_tokens: Optional[int] = Field(None, description="Tokens returned by the LLM")
+    latency_ms: Optional[float] = Field(None, description="Upstream LLM latency in milliseconds")
+    cost_usd: Optional[float] = Field(None, description="Estimated LLM cost in USD")
+    tokens_estimated: Optional[bool] = Field(None, description="Token counts are a ~4 chars/token estimate, not tiktoken")
     
     class Config:
         json_encoders = {
@@ -36,4 +42,13 @@ class ScenarioResponse(BaseModel):
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
-        }
\ No newline at end of file
+        }
+
+
+class SessionUsage(BaseModel):
+    session_id: Optional[str] = None
+    scenario_count: int
+    prompt_tokens: int
+    completion_tokens: int
+    cost_usd: float
+    avg_latency_ms: Optional[float] = None
\ No newline at end of file
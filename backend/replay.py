@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Traffic capture and replay for performance regression testing
+
+Capture real request patterns from the scenarios collection into a compact
+replay file, then replay it against an in-process instance of the API with
+the LLM stubbed out:
+
+    python replay.py capture traffic.json.gz --days 7
+    python replay.py replay traffic.json.gz --speed 10
+
+Replays write to a throwaway SQLite store unless --target configured is
+given, in which case the storage backend from .env is used.
+"""
+
+import asyncio
+import gzip
+import json
+import math
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import httpx
+import typer
+
+app = typer.Typer(help="Capture and replay scenario traffic")
+
+STUB_RESPONSES = [
+    "The world briefly forgot how to behave, and nobody minded.\n[MOOD: surreal]",
+    "Everyone panicked for exactly four minutes, then went back to lunch.\n[MOOD: humorous]",
+    "Chaos spread from city to city before a single cat restored order.\n[MOOD: chaotic]",
+]
+
+
+class StubLlmChat:
+    """Drop-in replacement for LlmChat that returns canned text after a simulated delay"""
+
+    latency_seconds = 0.0
+
+    def __init__(self, api_key: str, session_id: str, system_message: str):
+        self.session_id = session_id
+
+    def with_model(self, provider: str, model: str):
+        return self
+
+    async def send_message(self, user_message) -> str:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return random.choice(STUB_RESPONSES)
+
+
+async def _capture(output: str, days: Optional[int], limit: Optional[int]):
+    from database import repository, close_database_connection
+
+    await repository.initialize()
+    since = datetime.utcnow() - timedelta(days=days) if days else None
+
+    # Sessions are replaced with small integers so the replay file carries no identifiers
+    sessions = {}
+    events = []
+    start = None
+    async for scenario in repository.export(since=since, limit=limit):
+        start = start or scenario["timestamp"]
+        session = sessions.setdefault(scenario.get("session_id"), len(sessions))
+        events.append([
+            round((scenario["timestamp"] - start).total_seconds(), 3),
+            session,
+            scenario["question"],
+        ])
+
+    await close_database_connection()
+
+    with gzip.open(output, "wt", encoding="utf-8") as f:
+        json.dump({"version": 1, "sessions": len(sessions), "events": events}, f)
+
+    typer.echo(f"Captured {len(events)} requests from {len(sessions)} sessions into {output}")
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # Nearest-rank: the smallest value with at least `percentile`% of samples at or below it
+    index = min(len(ordered) - 1, max(0, math.ceil(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _schedule(events: list, speed: float, max_gap: float) -> List[float]:
+    """Send times in seconds from the start of the run for each captured event"""
+    send_times = []
+    scheduled = 0.0
+    previous_offset = 0.0
+    for offset, _, _ in events:
+        # Compress idle periods so overnight gaps don't dominate the run
+        scheduled += min(offset - previous_offset, max_gap) / speed
+        previous_offset = offset
+        send_times.append(scheduled)
+    return send_times
+
+
+async def _replay(
+    replay_file: str,
+    speed: float,
+    max_gap: float,
+    with_history: bool,
+    llm_latency: float,
+    concurrency: int,
+    target: str,
+):
+    if target not in ("isolated", "configured"):
+        raise typer.BadParameter(f"Unsupported target: {target}", param_hint="--target")
+    if speed <= 0:
+        raise typer.BadParameter("Speed must be greater than 0", param_hint="--speed")
+
+    scratch_dir = None
+    if target == "isolated":
+        # Must be set before the database module picks its backend
+        scratch_dir = tempfile.TemporaryDirectory(prefix="replay-")
+        os.environ["STORAGE_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = os.path.join(scratch_dir.name, "scenarios.db")
+
+    # Stub the LLM before the app builds its scenario service
+    import services.scenario_service as scenario_service_module
+    StubLlmChat.latency_seconds = llm_latency
+    scenario_service_module.LlmChat = StubLlmChat
+    from server import app as api_app
+    from database import repository, close_database_connection
+
+    # The ASGI transport doesn't run startup events, so prepare storage here
+    await repository.initialize()
+
+    with gzip.open(replay_file, "rt", encoding="utf-8") as f:
+        events = json.load(f)["events"]
+
+    run_id = uuid.uuid4().hex[:8]
+    latencies = {"generate": [], "history": []}
+    errors = {"generate": 0, "history": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(client: httpx.AsyncClient, endpoint: str, started: float, method: str, url: str, **kwargs):
+        try:
+            response = await client.request(method, url, **kwargs)
+            if response.status_code >= 400:
+                errors[endpoint] += 1
+        except Exception:
+            errors[endpoint] += 1
+        latencies[endpoint].append((time.perf_counter() - started) * 1000)
+
+    async def send(client: httpx.AsyncClient, session: int, question: str, scheduled_at: float):
+        session_id = f"replay-{run_id}-{session}"
+        # Latency is measured from the scheduled send time, so waiting on the concurrency
+        # limit counts against the server instead of hiding queueing (coordinated omission)
+        async with semaphore:
+            await timed(client, "generate", scheduled_at, "POST", "/api/scenarios/generate",
+                        json={"question": question, "session_id": session_id})
+            if with_history:
+                await timed(client, "history", time.perf_counter(), "GET", "/api/scenarios/history",
+                            params={"session_id": session_id})
+
+    transport = httpx.ASGITransport(app=api_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://replay") as client:
+        tasks = []
+        started = time.perf_counter()
+        for (_, session, question), scheduled in zip(events, _schedule(events, speed, max_gap)):
+            delay = scheduled - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(client, session, question, started + scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    await close_database_connection()
+    if scratch_dir:
+        scratch_dir.cleanup()
+
+    typer.echo(f"Replayed {len(events)} requests in {elapsed:.1f}s at {speed}x")
+    for endpoint, values in latencies.items():
+        if not values:
+            continue
+        typer.echo(
+            f"{endpoint:>9}: n={len(values)} "
+            f"p50={_percentile(values, 50):.1f}ms p90={_percentile(values, 90):.1f}ms "
+            f"p99={_percentile(values, 99):.1f}ms max={max(values):.1f}ms "
+            f"errors={errors[endpoint]} ({errors[endpoint] / len(values):.1%})"
+        )
+
+
+@app.command()
+def capture(
+    output: str = typer.Argument(..., help="Path of the gzipped replay file to write"),
+    days: Optional[int] = typer.Option(None, help="Only capture scenarios from the last N days"),
+    limit: Optional[int] = typer.Option(None, help="Maximum number of requests to capture"),
+):
+    """Extract request patterns from the scenarios collection into a replay file"""
+    asyncio.run(_capture(output, days, limit))
+
+
+@app.command()
+def replay(
+    replay_file: str = typer.Argument(..., help="Replay file produced by the capture command"),
+    speed: float = typer.Option(1.0, help="Playback speed multiplier"),
+    max_gap: float = typer.Option(60.0, help="Cap on the recorded gap between requests, in seconds"),
+    with_history: bool = typer.Option(True, help="Fetch session history after each generation"),
+    llm_latency: float = typer.Option(0.0, help="Simulated LLM latency in seconds"),
+    concurrency: int = typer.Option(100, help="Maximum requests in flight"),
+    target: str = typer.Option(
+        "isolated", help="'isolated' replays into a temporary SQLite store, 'configured' uses the .env storage"
+    ),
+):
+    """Replay a capture against the API in-process with the LLM stubbed"""
+    asyncio.run(_replay(replay_file, speed, max_gap, with_history, llm_latency, concurrency, target))
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+
+try:
+    from ..services.archive_service import ScenarioArchiveService, ARCHIVE_COLLECTION
+except ImportError:
+    # Fallback for when running as script
+    from services.archive_service import ScenarioArchiveService, ARCHIVE_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+# Server error code when a resume token has fallen off the oplog
+CHANGE_STREAM_HISTORY_LOST = 286
+
+
+class ScenarioRepository(ABC):
+    """Storage operations the API needs for scenarios, independent of the backing engine"""
+
+    archival_enabled = False
+    # Backends that set this implement watch_inserts() for a feed shared across workers
+    supports_change_streams = False
+
+    async def initialize(self):
+        """Prepare indexes or schema; called once at startup"""
+
+    async def close(self):
+        """Release connections held by the repository"""
+
+    async def run_archival(self, stop_event: asyncio.Event):
+        """Background loop moving old scenarios out of the hot store, if supported"""
+
+    @abstractmethod
+    async def insert(self, scenario: dict):
+        """Store a newly generated scenario"""
+
+    @abstractmethod
+    async def history(self, session_id: Optional[str], limit: int, skip: int) -> List[dict]:
+        """Scenarios for a session (or all sessions), newest first"""
+
+    @abstractmethod
+    async def count(self, session_id: Optional[str] = None) -> int:
+        """Number of stored scenarios for a session (or all sessions), including archived ones"""
+
+    @abstractmethod
+    async def history_validator(self, session_id: Optional[str]) -> Tuple[Optional[datetime], int]:
+        """Latest timestamp and count for a session, used to validate cached history pages"""
+
+    @abstractmethod
+    async def usage(self, session_id: Optional[str], limit: int) -> List[dict]:
+        """Token and cost totals per session, most expensive first"""
+
+    @abstractmethod
+    def export(self, since: Optional[datetime] = None, limit: Optional[int] = None) -> AsyncIterator[dict]:
+        """Iterate over scenarios oldest first"""
+
+
+class MongoScenarioRepository(ScenarioRepository):
+    """Repository backed by MongoDB through Motor, with a compressed archive tier"""
+
+    supports_change_streams = True
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.archive_service = ScenarioArchiveService()
+
+    @property
+    def archival_enabled(self) -> bool:
+        return self.archive_service.enabled
+
+    async def initialize(self):
+        await self.archive_service.ensure_indexes(self.db)
+
+    async def close(self):
+        self.db.client.close()
+
+    async def run_archival(self, stop_event: asyncio.Event):
+        await self.archive_service.run_periodically(self.db, stop_event)
+
+    def _query(self, session_id: Optional[str]) -> dict:
+        return {"session_id": session_id} if session_id else {}
+
+    async def insert(self, scenario: dict):
+        # Copy so the caller's dict isn't given a BSON ObjectId
+        await self.db.scenarios.insert_one(dict(scenario))
+
+    async def history(self, session_id: Optional[str], limit: int, skip: int) -> List[dict]:
+        return await self.archive_service.find_history(self.db, self._query(session_id), limit=limit, skip=skip)
+
+    async def count(self, session_id: Optional[str] = None) -> int:
+        # Like history() and export(), counts span the hot and archive tiers
+        query = self._query(session_id)
+        hot = await self.db.scenarios.count_documents(query)
+        archived = await self.db[ARCHIVE_COLLECTION].count_documents(query)
+        return hot + archived
+
+    async def history_validator(self, session_id: Optional[str]) -> Tuple[Optional[datetime], int]:
+        query = self._query(session_id)
+        latest = await self.db.scenarios.find_one(query, projection={"timestamp": 1, "_id": 0}, sort=[("timestamp", -1)])
+        # Global history uses collection metadata instead of scanning every document
+        if session_id:
+            count = await self.db.scenarios.count_documents(query)
+        else:
+            count = await self.db.scenarios.estimated_document_count()
+        return (latest["timestamp"] if latest else None), count
+
+    def _usage_pipeline(self, session_id: Optional[str], limit: int) -> List[dict]:
+        # Usage fields are kept on archived scenarios, so totals span both tiers. Each side
+        # filters before the union so it can use its (session_id, timestamp) index.
+        query = self._query(session_id)
+        return [
+            {"$match": query},
+            {"$unionWith": {"coll": ARCHIVE_COLLECTION, "pipeline": [{"$match": query}]}},
+            {"$group": {
+                "_id": "$session_id",
+                "scenario_count": {"$sum": 1},
+                "prompt_tokens": {"$sum": {"$ifNull": ["$prompt_tokens", 0]}},
+                "completion_tokens": {"$sum": {"$ifNull": ["$completion_tokens", 0]}},
+                "cost_usd": {"$sum": {"$ifNull": ["$cost_usd", 0]}},
+                "avg_latency_ms": {"$avg": "$latency_ms"}
+            }},
+            {"$sort": {"cost_usd": -1}},
+            {"$limit": limit}
+        ]
+
+    async def usage(self, session_id: Optional[str], limit: int) -> List[dict]:
+        results = await self.db.scenarios.aggregate(self._usage_pipeline(session_id, limit)).to_list(length=limit)
+        for result in results:
+            result["session_id"] = result.pop("_id")
+        return results
+
+    async def export(self, since: Optional[datetime] = None, limit: Optional[int] = None) -> AsyncIterator[dict]:
+        query = {"timestamp": {"$gte": since}} if since else {}
+        exported = 0
+
+        # Archived scenarios are older than everything still hot, so export them first
+        cursor = self.db[ARCHIVE_COLLECTION].find(query, projection={"_id": 0}).sort("timestamp", 1)
+        if limit:
+            cursor = cursor.limit(limit)
+        async for document in cursor:
+            yield self.archive_service._from_archive_document(document)
+            exported += 1
+
+        if limit and exported >= limit:
+            return
+        cursor = self.db.scenarios.find(query, projection={"_id": 0}).sort("timestamp", 1)
+        if limit:
+            cursor = cursor.limit(limit - exported)
+        async for scenario in cursor:
+            yield scenario
+
+    async def watch_inserts(self, resume_after: Optional[dict] = None) -> AsyncIterator[Tuple[Optional[dict], dict]]:
+        """Iterate over inserted scenarios with the resume token to continue after each one.
+
+        Idle polls yield (None, token) so callers can resume from the latest position even
+        when nothing has been inserted since the stream was opened.
+        """
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        stream = self.db.scenarios.watch(pipeline, resume_after=resume_after, max_await_time_ms=1000)
+        try:
+            # The stream is opened lazily, so surface a stale resume token here
+            change = await stream.try_next()
+        except OperationFailure as e:
+            await stream.close()
+            if resume_after is None or e.code != CHANGE_STREAM_HISTORY_LOST:
+                raise
+            logger.warning("Change stream resume token expired, continuing from now")
+            stream = self.db.scenarios.watch(pipeline, max_await_time_ms=1000)
+            change = None
+
+        async with stream:
+            while stream.alive:
+                yield (change["fullDocument"] if change else None), stream.resume_token
+                change = await stream.try_next()
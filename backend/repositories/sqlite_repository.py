@@ -0,0 +1,163 @@
+import asyncio
+import sqlite3
+import threading
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+
+try:
+    from .scenario_repository import ScenarioRepository
+except ImportError:
+    # Fallback for when running as script
+    from repositories.scenario_repository import ScenarioRepository
+
+COLUMNS = (
+    "id", "question", "scenario", "mood", "timestamp", "session_id",
+    "model", "prompt_tokens", "completion_tokens", "latency_ms", "cost_usd", "tokens_estimated"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    id TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    mood TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    session_id TEXT,
+    model TEXT,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    latency_ms REAL,
+    cost_usd REAL,
+    tokens_estimated INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_session_timestamp ON scenarios (session_id, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_scenarios_timestamp ON scenarios (timestamp DESC);
+"""
+
+
+class SQLiteScenarioRepository(ScenarioRepository):
+    """Embedded repository backed by a local SQLite file in WAL mode"""
+
+    def __init__(self, path: str):
+        self.path = path
+        # SQLite allows a single writer, so writes share one connection behind a lock.
+        # Reads use a connection per worker thread and run concurrently with it under WAL.
+        self._connection = self._connect()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._read_connections: List[sqlite3.Connection] = []
+        self._read_connections_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _read_connection(self) -> Optional[sqlite3.Connection]:
+        # Every connection to :memory: is a separate database, so reads share the writer there
+        if self.path == ":memory:":
+            return None
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            self._local.connection = connection
+            with self._read_connections_lock:
+                self._read_connections.append(connection)
+        return connection
+
+    def _write(self, sql: str, params: tuple = ()):
+        with self._lock:
+            self._connection.execute(sql, params)
+            self._connection.commit()
+
+    def _read(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        connection = self._read_connection()
+        if connection is None:
+            with self._lock:
+                return self._connection.execute(sql, params).fetchall()
+        return connection.execute(sql, params).fetchall()
+
+    async def _run(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        return await asyncio.to_thread(self._read, sql, params)
+
+    def _to_scenario(self, row: sqlite3.Row) -> dict:
+        scenario = dict(row)
+        scenario["timestamp"] = datetime.fromisoformat(scenario["timestamp"])
+        return scenario
+
+    def _where(self, session_id: Optional[str]) -> Tuple[str, tuple]:
+        return ("WHERE session_id = ?", (session_id,)) if session_id else ("", ())
+
+    async def initialize(self):
+        def setup():
+            with self._lock:
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute("PRAGMA synchronous=NORMAL")
+                self._connection.executescript(SCHEMA)
+        await asyncio.to_thread(setup)
+
+    async def close(self):
+        def close_all():
+            with self._read_connections_lock:
+                for connection in self._read_connections:
+                    connection.close()
+                self._read_connections.clear()
+            self._connection.close()
+        await asyncio.to_thread(close_all)
+
+    async def insert(self, scenario: dict):
+        values = tuple(
+            scenario["timestamp"].isoformat(timespec="microseconds") if column == "timestamp" else scenario.get(column)
+            for column in COLUMNS
+        )
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        await asyncio.to_thread(
+            self._write,
+            f"INSERT INTO scenarios ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+            values
+        )
+
+    async def history(self, session_id: Optional[str], limit: int, skip: int) -> List[dict]:
+        where, params = self._where(session_id)
+        rows = await self._run(
+            f"SELECT * FROM scenarios {where} ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+            params + (limit, skip)
+        )
+        return [self._to_scenario(row) for row in rows]
+
+    async def count(self, session_id: Optional[str] = None) -> int:
+        where, params = self._where(session_id)
+        rows = await self._run(f"SELECT COUNT(*) FROM scenarios {where}", params)
+        return rows[0][0]
+
+    async def history_validator(self, session_id: Optional[str]) -> Tuple[Optional[datetime], int]:
+        where, params = self._where(session_id)
+        rows = await self._run(f"SELECT MAX(timestamp), COUNT(*) FROM scenarios {where}", params)
+        latest, count = rows[0]
+        return (datetime.fromisoformat(latest) if latest else None), count
+
+    async def usage(self, session_id: Optional[str], limit: int) -> List[dict]:
+        where, params = self._where(session_id)
+        rows = await self._run(
+            f"""SELECT session_id,
+                       COUNT(*) AS scenario_count,
+                       COALESCE(SUM(prompt_tokens), 0) AS prompt_tokens,
+                       COALESCE(SUM(completion_tokens), 0) AS completion_tokens,
+                       COALESCE(SUM(cost_usd), 0) AS cost_usd,
+                       AVG(latency_ms) AS avg_latency_ms
+                FROM scenarios {where}
+                GROUP BY session_id
+                ORDER BY cost_usd DESC
+                LIMIT ?""",
+            params + (limit,)
+        )
+        return [dict(row) for row in rows]
+
+    async def export(self, since: Optional[datetime] = None, limit: Optional[int] = None) -> AsyncIterator[dict]:
+        where, params = ("WHERE timestamp >= ?", (since.isoformat(timespec="microseconds"),)) if since else ("", ())
+        rows = await self._run(
+            f"SELECT * FROM scenarios {where} ORDER BY timestamp ASC LIMIT ?",
+            params + (limit or -1,)
+        )
+        for row in rows:
+            yield self._to_scenario(row)
@@ -1,18 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi import APIRouter, HTTPException, Depends, Header, Response, WebSocket, WebSocketDisconnect
 from typing import List, Optional
+import asyncio
 import logging
+import hashlib
 from datetime import datetime
 
 try:
-    from ..models.scenario import ScenarioCreate, ScenarioResponse
+    from ..models.scenario import ScenarioCreate, ScenarioResponse, SessionUsage
     from ..services.scenario_service import ScenarioGeneratorService
-    from ..database import get_database
+    from ..services.live_feed import ScenarioBroadcaster
+    from ..repositories.scenario_repository import ScenarioRepository
+    from ..database import get_repository
 except ImportError:
     # Fallback for when running as script
-    from models.scenario import ScenarioCreate, ScenarioResponse
+    from models.scenario import ScenarioCreate, ScenarioResponse, SessionUsage
     from services.scenario_service import ScenarioGeneratorService
-    from database import get_database
+    from services.live_feed import ScenarioBroadcaster
+    from repositories.scenario_repository import ScenarioRepository
+    from database import get_repository
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +25,13 @@ router = APIRouter(prefix="/scenarios", tags=["scenarios"])
 
 # Initialize scenario service
 scenario_service = ScenarioGeneratorService()
+live_feed = ScenarioBroadcaster()
 
 
 @router.post("/generate", response_model=ScenarioResponse)
 async def generate_scenario(
     request: ScenarioCreate,
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    repository: ScenarioRepository = Depends(get_repository)
 ):
     """Generate a new 'what if' scenario using AI"""
     try:
@@ -36,8 +42,8 @@ async def generate_scenario(
         )
         
         # Save to database
-        result = await db.scenarios.insert_one(scenario_data)
-        scenario_data["_id"] = str(result.inserted_id)
+        await repository.insert(scenario_data)
+        live_feed.publish_local(scenario_data)
         
         logger.info(f"Generated scenario with ID: {scenario_data['id']}")
         
@@ -51,23 +57,34 @@ async def generate_scenario(
         )
 
 
+async def _history_etag(repository: ScenarioRepository, session_id: Optional[str], limit: int, skip: int) -> str:
+    """Cheap validator for a history page: latest timestamp plus count of matching scenarios"""
+    latest, count = await repository.history_validator(session_id)
+    latest_timestamp = latest.isoformat() if latest else ""
+    validator = f"{session_id or ''}|{latest_timestamp}|{count}|{limit}|{skip}"
+    return f'W/"{hashlib.sha1(validator.encode()).hexdigest()}"'
+
+
 @router.get("/history", response_model=List[ScenarioResponse])
 async def get_scenario_history(
+    response: Response,
     session_id: Optional[str] = None,
     limit: int = 10,
     skip: int = 0,
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    if_none_match: Optional[str] = Header(None),
+    repository: ScenarioRepository = Depends(get_repository)
 ):
     """Get scenario history for a session or all scenarios"""
     try:
-        # Build query
-        query = {}
-        if session_id:
-            query["session_id"] = session_id
+        # Answer conditional requests without building the body
+        etag = await _history_etag(repository, session_id, limit=limit, skip=skip)
+        cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=cache_headers)
+        response.headers.update(cache_headers)
         
         # Get scenarios with pagination
-        cursor = db.scenarios.find(query).sort("timestamp", -1).skip(skip).limit(limit)
-        scenarios = await cursor.to_list(length=limit)
+        scenarios = await repository.history(session_id, limit=limit, skip=skip)
         
         # Convert to response format
         scenario_responses = []
@@ -82,4 +99,66 @@ async def get_scenario_history(
         raise HTTPException(
             status_code=500,
             detail=f"Failed to retrieve scenario history: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/usage", response_model=List[SessionUsage])
+async def get_usage(
+    session_id: Optional[str] = None,
+    limit: int = 10,
+    repository: ScenarioRepository = Depends(get_repository)
+):
+    """Get token and cost totals for a session, or the most expensive sessions"""
+    try:
+        results = await repository.usage(session_id, limit=limit)
+        
+        usage = [SessionUsage(**result) for result in results]
+        
+        logger.info(f"Retrieved usage for {len(usage)} sessions")
+        return usage
+        
+    except Exception as e:
+        logger.error(f"Error in get_usage: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve usage: {str(e)}"
+        )
+
+
+@router.websocket("/live")
+async def live_scenarios(websocket: WebSocket):
+    """Stream newly generated scenarios to the client as they are created"""
+    await websocket.accept()
+    queue = live_feed.subscribe()
+    # Listen for the client alongside the feed so closed sockets are released while the feed is quiet
+    receive_task = asyncio.create_task(websocket.receive())
+    try:
+        while True:
+            message_task = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait({message_task, receive_task}, return_when=asyncio.FIRST_COMPLETED)
+
+            if receive_task in done:
+                if receive_task.result()["type"] == "websocket.disconnect":
+                    message_task.cancel()
+                    break
+                # Anything the client sends is ignored
+                receive_task = asyncio.create_task(websocket.receive())
+
+            if message_task not in done:
+                message_task.cancel()
+                continue
+
+            # Both may finish together; the message is already off the queue, so still send it
+            message = message_task.result()
+            if message is None:
+                # Dropped by the broadcaster for falling behind
+                await websocket.close(code=1013, reason="Live feed consumer too slow")
+                break
+            await websocket.send_text(message)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Error in live_scenarios: {str(e)}")
+    finally:
+        receive_task.cancel()
+        live_feed.unsubscribe(queue)
@@ -1,18 +1,21 @@
 from fastapi import FastAPI, APIRouter
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 import os
+import asyncio
+import contextlib
 import logging
 from pathlib import Path
 
 # Import routes
 try:
-    from .routes.scenarios import router as scenarios_router
-    from .database import close_database_connection
+    from .routes.scenarios import router as scenarios_router, live_feed
+    from .database import close_database_connection, repository, storage_backend
 except ImportError:
     # Fallback for when running as script
-    from routes.scenarios import router as scenarios_router
-    from database import close_database_connection
+    from routes.scenarios import router as scenarios_router, live_feed
+    from database import close_database_connection, repository, storage_backend
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -41,8 +44,24 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Response compression for large JSON payloads (gzip, brotli or none)
+response_compression = os.environ.get('RESPONSE_COMPRESSION', 'gzip').lower()
+compression_minimum_size = int(os.environ.get('COMPRESSION_MINIMUM_SIZE', '1000'))
+if response_compression not in ('gzip', 'brotli', 'none'):
+    raise ValueError(f"Unsupported RESPONSE_COMPRESSION: {response_compression}")
+if response_compression == 'brotli':
+    try:
+        from brotli_asgi import BrotliMiddleware
+    except ImportError:
+        raise ValueError("RESPONSE_COMPRESSION=brotli requires the brotli-asgi package")
+    # Serves gzip to clients that don't accept br
+    app.add_middleware(BrotliMiddleware, minimum_size=compression_minimum_size)
+elif response_compression == 'gzip':
+    app.add_middleware(GZipMiddleware, minimum_size=compression_minimum_size)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -50,8 +69,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Background archival of scenarios past the retention window and the shared live feed
+background_stop_event = asyncio.Event()
+archive_task = None
+live_feed_task = None
+
+# Startup event
+@app.on_event("startup")
+async def startup_event():
+    global archive_task, live_feed_task
+    await repository.initialize()
+    if repository.archival_enabled:
+        archive_task = asyncio.create_task(repository.run_archival(background_stop_event))
+        logger.info("Scenario archival enabled")
+    if live_feed.source == 'changestream':
+        if not repository.supports_change_streams:
+            raise ValueError(f"LIVE_FEED_SOURCE=changestream is not supported by STORAGE_BACKEND={storage_backend}")
+        live_feed_task = asyncio.create_task(live_feed.run_change_stream(repository, background_stop_event))
+        logger.info("Live feed reading from the scenario change stream")
+
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
+    background_stop_event.set()
+    if archive_task:
+        await archive_task
+    if live_feed_task:
+        # Let the change stream unwind before the client it reads from is closed
+        live_feed_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await live_feed_task
     await close_database_connection()
     logger.info("Application shutdown complete")
\ No newline at end of file
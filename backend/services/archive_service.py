@@ -0,0 +1,161 @@
+import os
+import asyncio
+import logging
+import zlib
+from datetime import datetime, timedelta
+from typing import List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+from dotenv import load_dotenv
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLLECTION = "scenarios_archive"
+
+
+class ScenarioArchiveService:
+    """Moves old scenarios from the hot `scenarios` collection into a compressed archive"""
+
+    def __init__(self):
+        # Retention policy in days; 0 (the default) disables archival until operators opt in
+        self.retention_days = int(os.environ.get('SCENARIO_RETENTION_DAYS', '0'))
+        self.batch_size = int(os.environ.get('ARCHIVE_BATCH_SIZE', '500'))
+        self.interval_seconds = int(os.environ.get('ARCHIVE_INTERVAL_SECONDS', '3600'))
+
+        self.compression = os.environ.get('ARCHIVE_COMPRESSION', 'zlib').lower()
+        if self.compression not in ('zlib', 'zstd'):
+            raise ValueError(f"Unsupported ARCHIVE_COMPRESSION: {self.compression}")
+        if self.compression == 'zstd' and zstandard is None:
+            logger.warning("zstandard is not installed, falling back to zlib compression")
+            self.compression = 'zlib'
+
+        # Whether the archive holds data, once known; see _archive_has_data()
+        self._archive_populated: Optional[bool] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.retention_days > 0
+
+    def _compress(self, text: str) -> bytes:
+        data = text.encode('utf-8')
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor().compress(data)
+        return zlib.compress(data)
+
+    def _decompress(self, data: bytes, compression: str) -> str:
+        if compression == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd-archived scenarios")
+            return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+        return zlib.decompress(data).decode('utf-8')
+
+    def _to_archive_document(self, scenario: dict) -> dict:
+        document = {key: value for key, value in scenario.items() if key not in ('_id', 'scenario')}
+        document["scenario_compressed"] = self._compress(scenario["scenario"])
+        document["compression"] = self.compression
+        return document
+
+    def _from_archive_document(self, document: dict) -> dict:
+        scenario = {
+            key: value for key, value in document.items()
+            if key not in ('_id', 'scenario_compressed', 'compression')
+        }
+        scenario["scenario"] = self._decompress(document["scenario_compressed"], document["compression"])
+        return scenario
+
+    async def ensure_indexes(self, db: AsyncIOMotorDatabase):
+        """Create the indexes history queries rely on in both tiers"""
+        for collection in (db.scenarios, db[ARCHIVE_COLLECTION]):
+            await collection.create_index([("session_id", 1), ("timestamp", -1)])
+            await collection.create_index([("timestamp", -1)])
+        await db[ARCHIVE_COLLECTION].create_index("id", unique=True)
+
+    async def archive_old_scenarios(self, db: AsyncIOMotorDatabase) -> int:
+        """Move scenarios older than the retention window into the archive, batch by batch"""
+        if not self.enabled:
+            return 0
+
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        archived = 0
+
+        while True:
+            cursor = db.scenarios.find({"timestamp": {"$lt": cutoff}}).sort("timestamp", 1).limit(self.batch_size)
+            batch = await cursor.to_list(length=self.batch_size)
+            if not batch:
+                break
+
+            # Upsert by id so a batch interrupted between copy and delete can be safely retried
+            await db[ARCHIVE_COLLECTION].bulk_write([
+                ReplaceOne({"id": scenario["id"]}, self._to_archive_document(scenario), upsert=True)
+                for scenario in batch
+            ], ordered=False)
+            await db.scenarios.delete_many({"_id": {"$in": [scenario["_id"] for scenario in batch]}})
+
+            archived += len(batch)
+            if len(batch) < self.batch_size:
+                break
+
+        if archived:
+            self._archive_populated = True
+            logger.info(f"Archived {archived} scenarios older than {cutoff.isoformat()}")
+        return archived
+
+    async def _archive_has_data(self, db: AsyncIOMotorDatabase) -> bool:
+        """Whether history reads need to consider the archive at all"""
+        if self._archive_populated is not None:
+            return self._archive_populated
+        populated = await db[ARCHIVE_COLLECTION].estimated_document_count() > 0
+        # Archived data never leaves the archive, and with archival disabled an empty
+        # archive stays empty, so either answer can be remembered
+        if populated or not self.enabled:
+            self._archive_populated = populated
+        return populated
+
+    async def find_history(
+        self,
+        db: AsyncIOMotorDatabase,
+        query: dict,
+        limit: int,
+        skip: int
+    ) -> List[dict]:
+        """Page through history, falling through to the archive only past the hot window"""
+        cursor = db.scenarios.find(query).sort("timestamp", -1).skip(skip).limit(limit)
+        scenarios = await cursor.to_list(length=limit)
+
+        if len(scenarios) >= limit or not await self._archive_has_data(db):
+            return scenarios
+
+        # The hot page ran short, so the remainder comes from the archive. A non-empty
+        # short page means the hot window ends inside it; only an empty page needs a count.
+        if scenarios:
+            hot_total = skip + len(scenarios)
+        else:
+            hot_total = await db.scenarios.count_documents(query)
+        archive_skip = max(0, skip - hot_total)
+        remaining = limit - len(scenarios)
+
+        cursor = db[ARCHIVE_COLLECTION].find(query).sort("timestamp", -1).skip(archive_skip).limit(remaining)
+        archived = await cursor.to_list(length=remaining)
+        scenarios.extend(self._from_archive_document(document) for document in archived)
+        return scenarios
+
+    async def run_periodically(self, db: AsyncIOMotorDatabase, stop_event: Optional[asyncio.Event] = None):
+        """Background loop applying the retention policy every ARCHIVE_INTERVAL_SECONDS"""
+        stop_event = stop_event or asyncio.Event()
+        while not stop_event.is_set():
+            try:
+                await self.archive_old_scenarios(db)
+            except Exception as e:
+                logger.error(f"Error archiving scenarios: {str(e)}")
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,90 @@
+import os
+import asyncio
+import logging
+from typing import Optional, Set
+from dotenv import load_dotenv
+
+try:
+    from ..models.scenario import ScenarioResponse
+    from ..repositories.scenario_repository import ScenarioRepository
+except ImportError:
+    # Fallback for when running as script
+    from models.scenario import ScenarioResponse
+    from repositories.scenario_repository import ScenarioRepository
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class ScenarioBroadcaster:
+    """In-process pub/sub fanning newly generated scenarios out to live feed subscribers"""
+
+    def __init__(self):
+        self.buffer_size = int(os.environ.get('LIVE_FEED_BUFFER_SIZE', '32'))
+        # "local" publishes from this worker's inserts; "changestream" tails Mongo so workers share one feed
+        self.source = os.environ.get('LIVE_FEED_SOURCE', 'local').lower()
+        if self.source not in ('local', 'changestream'):
+            raise ValueError(f"Unsupported LIVE_FEED_SOURCE: {self.source}")
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.buffer_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, scenario: dict):
+        """Serialize once and hand the message to every subscriber, dropping slow consumers"""
+        if not self._subscribers:
+            return
+
+        # Session ids stay private on the public feed
+        message = ScenarioResponse(**scenario).model_dump_json(exclude={"session_id"})
+
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # A full buffer means the client can't keep up; drop it instead of stalling everyone
+                self._subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+                logger.warning("Dropped slow live feed subscriber")
+
+    def publish_local(self, scenario: dict):
+        """Publish a scenario inserted by this worker, unless the change stream will deliver it"""
+        if self.source == 'local':
+            self.publish(scenario)
+
+    async def run_change_stream(self, repository: ScenarioRepository, stop_event: Optional[asyncio.Event] = None):
+        """Feed inserts from the shared database into the broadcaster, resuming after errors"""
+        if not repository.supports_change_streams:
+            raise ValueError(f"{type(repository).__name__} does not support LIVE_FEED_SOURCE=changestream")
+
+        stop_event = stop_event or asyncio.Event()
+        # Resuming from the last token delivers inserts made while the stream was reconnecting
+        resume_token = None
+        while not stop_event.is_set():
+            try:
+                async for scenario, resume_token in repository.watch_inserts(resume_after=resume_token):
+                    if scenario is not None:
+                        self.publish(scenario)
+                    if stop_event.is_set():
+                        break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error reading scenario change stream: {str(e)}")
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    pass
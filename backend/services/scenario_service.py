@@ -1,4 +1,6 @@
 import os
+import re
+import time
 import logging
 import uuid
 from datetime import datetime
@@ -6,11 +8,19 @@ from typing import Optional
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 from dotenv import load_dotenv
 
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+LLM_PROVIDER = "openai"
+LLM_MODEL = "gpt-4o-mini"
+
 
 class ScenarioGeneratorService:
     def __init__(self):
@@ -18,6 +28,17 @@ class ScenarioGeneratorService:
         if not self.api_key:
             raise ValueError("EMERGENT_LLM_KEY environment variable is required")
         
+        # Output budget and pricing (USD per 1K tokens) for usage accounting
+        self.max_output_words = int(os.environ.get('MAX_SCENARIO_WORDS', '150'))
+        self.prompt_cost_per_1k = float(os.environ.get('LLM_PROMPT_COST_PER_1K', '0.00015'))
+        self.completion_cost_per_1k = float(os.environ.get('LLM_COMPLETION_COST_PER_1K', '0.0006'))
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(LLM_MODEL)
+            except Exception as e:
+                logger.warning(f"Falling back to estimated token counts: {e}")
+        
         # System message for creative "what if" scenario generation
         self.system_message = """You are a creative "What If" scenario generator. Your job is to create entertaining, imaginative, and engaging short stories based on "what if" questions.
 
@@ -49,31 +70,68 @@ Always start your response with the scenario text, then end with [MOOD: category
                 api_key=self.api_key,
                 session_id=session_id,
                 system_message=self.system_message
-            ).with_model("openai", "gpt-4o-mini")
+            ).with_model(LLM_PROVIDER, LLM_MODEL)
             
             # Create user message
             user_message = UserMessage(text=question)
             
             # Generate response
             logger.info(f"Generating scenario for question: {question}")
+            started = time.perf_counter()
             response = await chat.send_message(user_message)
+            latency_ms = (time.perf_counter() - started) * 1000
             
             # Parse response to extract scenario and mood
             scenario_text, mood = self._parse_response(response)
             
+            # Account for the tokens actually produced upstream, not the trimmed text
+            prompt_tokens = self._count_tokens(self.system_message) + self._count_tokens(question)
+            completion_tokens = self._count_tokens(response)
+            cost_usd = (
+                prompt_tokens * self.prompt_cost_per_1k + completion_tokens * self.completion_cost_per_1k
+            ) / 1000
+            logger.info(
+                f"LLM usage: session={session_id} prompt_tokens={prompt_tokens} "
+                f"completion_tokens={completion_tokens} latency_ms={latency_ms:.1f} cost_usd={cost_usd:.6f}"
+            )
+            
             return {
                 "id": str(uuid.uuid4()),
                 "question": question,
                 "scenario": scenario_text,
                 "mood": mood,
                 "timestamp": datetime.utcnow(),
-                "session_id": session_id
+                "session_id": session_id,
+                "model": LLM_MODEL,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "latency_ms": round(latency_ms, 1),
+                "cost_usd": cost_usd,
+                "tokens_estimated": self._encoding is None
             }
             
         except Exception as e:
             logger.error(f"Error generating scenario: {str(e)}")
             raise Exception(f"Failed to generate scenario: {str(e)}")
     
+    def _count_tokens(self, text: str) -> int:
+        """Count tokens with tiktoken when available, otherwise estimate ~4 characters per token"""
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return max(1, round(len(text) / 4)) if text else 0
+    
+    def _trim_to_word_limit(self, text: str, max_words: int) -> str:
+        """Trim text to at most max_words, preferring to end on a sentence boundary"""
+        words = list(re.finditer(r'\S+', text))
+        if max_words <= 0 or len(words) <= max_words:
+            return text
+        
+        trimmed = text[:words[max_words - 1].end()]
+        sentence_end = max(trimmed.rfind('.'), trimmed.rfind('!'), trimmed.rfind('?'))
+        if sentence_end >= len(trimmed) // 2:
+            return trimmed[:sentence_end + 1]
+        return trimmed.rstrip(',;:') + '...'
+    
     def _parse_response(self, response: str) -> tuple[str, str]:
         """Parse the LLM response to extract scenario text and mood"""
         try:
@@ -98,8 +156,11 @@ Always start your response with the scenario text, then end with [MOOD: category
             if not scenario:
                 scenario = response.strip()
             
+            # Enforce the output length budget the system prompt asks for
+            scenario = self._trim_to_word_limit(scenario, self.max_output_words)
+            
             return scenario, mood
             
         except Exception as e:
             logger.warning(f"Error parsing response, using raw text: {e}")
-            return response.strip(), "humorous"
\ No newline at end of file
+            return self._trim_to_word_limit(response.strip(), self.max_output_words), "humorous"
\ No newline at end of file
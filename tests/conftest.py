@@ -0,0 +1,47 @@
+import asyncio
+import inspect
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Keep tests off the real MongoDB configured in backend/.env
+os.environ.setdefault("STORAGE_BACKEND", "sqlite")
+os.environ.setdefault("SQLITE_PATH", ":memory:")
+
+BASE_TIME = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """Run `async def` tests on a fresh event loop"""
+    if inspect.iscoroutinefunction(pyfuncitem.obj):
+        arguments = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+        asyncio.run(pyfuncitem.obj(**arguments))
+        return True
+
+
+@pytest.fixture
+def make_scenario():
+    """Factory for stored scenario dicts; higher indexes are newer.
+
+    Timestamps start at BASE_TIME, or `age_days` before now when given, plus `index` minutes.
+    """
+    def factory(index: int, session_id: str = "session-a", age_days: Optional[int] = None, **fields) -> dict:
+        base = datetime.utcnow() - timedelta(days=age_days) if age_days is not None else BASE_TIME
+        return {
+            "id": f"scenario-{index}",
+            "question": f"What if {index}?",
+            "scenario": f"Scenario text {index}",
+            "mood": "humorous",
+            "timestamp": base + timedelta(minutes=index),
+            "session_id": session_id,
+            **fields,
+        }
+    return factory
@@ -0,0 +1,116 @@
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from services.archive_service import ScenarioArchiveService, ARCHIVE_COLLECTION
+
+
+@pytest.fixture
+def db():
+    return mongomock_motor.AsyncMongoMockClient()["test_database"]
+
+
+@pytest.fixture
+def archive_service(monkeypatch):
+    monkeypatch.setenv("SCENARIO_RETENTION_DAYS", "30")
+    monkeypatch.setenv("ARCHIVE_BATCH_SIZE", "2")
+    return ScenarioArchiveService()
+
+
+def test_archival_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("SCENARIO_RETENTION_DAYS", raising=False)
+    assert not ScenarioArchiveService().enabled
+
+
+async def test_archive_old_scenarios_moves_and_compresses(db, archive_service, make_scenario):
+    await db.scenarios.insert_many([make_scenario(i, age_days=40) for i in range(5)])
+    await db.scenarios.insert_one(make_scenario(5, age_days=1))
+
+    archived = await archive_service.archive_old_scenarios(db)
+
+    assert archived == 5
+    assert await db.scenarios.count_documents({}) == 1
+    document = await db[ARCHIVE_COLLECTION].find_one({"id": "scenario-0"})
+    assert "scenario" not in document
+    assert archive_service._from_archive_document(document)["scenario"] == "Scenario text 0"
+
+
+async def test_find_history_falls_through_to_archive(db, archive_service, make_scenario):
+    await db.scenarios.insert_many([make_scenario(i, age_days=40) for i in range(3)])
+    await db.scenarios.insert_many([make_scenario(i, age_days=1) for i in range(3, 6)])
+    await archive_service.archive_old_scenarios(db)
+
+    # First page is served entirely from the hot collection
+    page = await archive_service.find_history(db, {}, limit=3, skip=0)
+    assert [s["id"] for s in page] == ["scenario-5", "scenario-4", "scenario-3"]
+
+    # A page straddling the hot window continues into the archive
+    page = await archive_service.find_history(db, {}, limit=3, skip=2)
+    assert [s["id"] for s in page] == ["scenario-3", "scenario-2", "scenario-1"]
+    assert page[1]["scenario"] == "Scenario text 2"
+
+    # A page past the hot window is served entirely from the archive
+    page = await archive_service.find_history(db, {}, limit=3, skip=4)
+    assert [s["id"] for s in page] == ["scenario-1", "scenario-0"]
+
+
+async def test_find_history_filters_archive_by_session(db, archive_service, make_scenario):
+    await db.scenarios.insert_one(make_scenario(0, session_id="session-a", age_days=40))
+    await db.scenarios.insert_one(make_scenario(1, session_id="session-b", age_days=40))
+    await archive_service.archive_old_scenarios(db)
+
+    page = await archive_service.find_history(db, {"session_id": "session-b"}, limit=10, skip=0)
+    assert [s["id"] for s in page] == ["scenario-1"]
+
+
+class RecordingCollection:
+    """Wraps a collection and records which methods are called on it"""
+
+    def __init__(self, collection, calls):
+        self._collection = collection
+        self._calls = calls
+
+    def __getattr__(self, name):
+        self._calls.append(name)
+        return getattr(self._collection, name)
+
+
+class RecordingDatabase:
+    def __init__(self, db):
+        self._db = db
+        self.calls = {"scenarios": [], ARCHIVE_COLLECTION: []}
+
+    def __getattr__(self, name):
+        return self[name]
+
+    def __getitem__(self, name):
+        return RecordingCollection(self._db[name], self.calls[name])
+
+
+async def test_short_page_skips_empty_archive(db, make_scenario, monkeypatch):
+    monkeypatch.delenv("SCENARIO_RETENTION_DAYS", raising=False)
+    archive_service = ScenarioArchiveService()
+    await db.scenarios.insert_many([make_scenario(i) for i in range(3)])
+    recording_db = RecordingDatabase(db)
+
+    page = await archive_service.find_history(recording_db, {}, limit=10, skip=0)
+    assert [s["id"] for s in page] == ["scenario-2", "scenario-1", "scenario-0"]
+    assert recording_db.calls["scenarios"] == ["find"]
+    assert "find" not in recording_db.calls[ARCHIVE_COLLECTION]
+
+    # Once the archive is known to be empty it isn't consulted again
+    recording_db.calls[ARCHIVE_COLLECTION].clear()
+    await archive_service.find_history(recording_db, {}, limit=10, skip=0)
+    assert recording_db.calls[ARCHIVE_COLLECTION] == []
+
+
+async def test_short_hot_page_does_not_count(db, archive_service, make_scenario):
+    await db.scenarios.insert_many([make_scenario(i, age_days=40) for i in range(3)])
+    await db.scenarios.insert_many([make_scenario(i, age_days=1) for i in range(3, 5)])
+    await archive_service.archive_old_scenarios(db)
+    recording_db = RecordingDatabase(db)
+
+    page = await archive_service.find_history(recording_db, {}, limit=3, skip=0)
+
+    assert [s["id"] for s in page] == ["scenario-4", "scenario-3", "scenario-2"]
+    assert "count_documents" not in recording_db.calls["scenarios"]
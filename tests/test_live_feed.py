@@ -0,0 +1,128 @@
+import asyncio
+import json
+
+import pytest
+
+from repositories.sqlite_repository import SQLiteScenarioRepository
+from services.live_feed import ScenarioBroadcaster
+
+
+@pytest.fixture
+def broadcaster(monkeypatch):
+    monkeypatch.setenv("LIVE_FEED_BUFFER_SIZE", "2")
+    monkeypatch.setenv("LIVE_FEED_SOURCE", "local")
+    return ScenarioBroadcaster()
+
+
+def test_publish_fans_out_without_session_ids(broadcaster, make_scenario):
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+
+    broadcaster.publish(make_scenario(0, session_id="private-session"))
+
+    for queue in (first, second):
+        message = json.loads(queue.get_nowait())
+        assert message["id"] == "scenario-0"
+        assert "session_id" not in message
+
+
+def test_slow_consumer_is_dropped(broadcaster, make_scenario):
+    slow, fast = broadcaster.subscribe(), broadcaster.subscribe()
+
+    for index in range(3):
+        broadcaster.publish(make_scenario(index))
+        fast.get_nowait()
+
+    assert broadcaster.subscriber_count == 1
+    assert slow.get_nowait() is None
+
+
+async def test_change_stream_source_rejected_without_support(tmp_path, broadcaster):
+    repository = SQLiteScenarioRepository(str(tmp_path / "scenarios.db"))
+
+    with pytest.raises(ValueError):
+        await broadcaster.run_change_stream(repository)
+
+
+class FakeChangeStream:
+    def __init__(self, changes, error=None):
+        self.changes = list(changes)
+        self.error = error
+        self.closed = False
+        self.exhausted = False
+        self.resume_token = None
+
+    @property
+    def alive(self):
+        return not self.closed and not self.exhausted
+
+    async def try_next(self):
+        if self.error:
+            raise self.error
+        if not self.changes:
+            self.exhausted = True
+            return None
+        change = self.changes.pop(0)
+        self.resume_token = {"_data": change["fullDocument"]["id"]}
+        return change
+
+    async def close(self):
+        self.closed = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+async def test_watch_inserts_closes_stream_with_expired_token(monkeypatch, make_scenario):
+    pymongo_errors = pytest.importorskip("pymongo.errors")
+    from repositories.scenario_repository import MongoScenarioRepository, CHANGE_STREAM_HISTORY_LOST
+
+    stale = FakeChangeStream([], error=pymongo_errors.OperationFailure("lost", code=CHANGE_STREAM_HISTORY_LOST))
+    fresh = FakeChangeStream([{"fullDocument": make_scenario(0)}])
+    streams = iter([stale, fresh])
+
+    class Collection:
+        def watch(self, pipeline, **kwargs):
+            return next(streams)
+
+    class Database:
+        scenarios = Collection()
+
+    repository = MongoScenarioRepository(Database())
+
+    yielded = [item async for item in repository.watch_inserts(resume_after={"_data": "stale"})]
+
+    assert stale.closed
+    assert fresh.closed
+    # The fallback stream starts from now, then delivers the insert with its resume token
+    assert yielded == [(None, None), (make_scenario(0), {"_data": "scenario-0"})]
+
+
+async def test_live_socket_sends_message_arriving_with_client_message(monkeypatch):
+    pytest.importorskip("emergentintegrations")
+    import routes.scenarios as scenarios_routes
+
+    queue = asyncio.Queue()
+    queue.put_nowait("queued-message")
+    monkeypatch.setattr(scenarios_routes.live_feed, "subscribe", lambda: queue)
+
+    class FakeWebSocket:
+        def __init__(self):
+            self.sent = []
+            self.received = iter([{"type": "websocket.receive", "text": "ping"}, {"type": "websocket.disconnect"}])
+
+        async def accept(self):
+            pass
+
+        async def receive(self):
+            return next(self.received)
+
+        async def send_text(self, message):
+            self.sent.append(message)
+
+    websocket = FakeWebSocket()
+    await scenarios_routes.live_scenarios(websocket)
+
+    assert websocket.sent == ["queued-message"]
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from repositories.scenario_repository import MongoScenarioRepository
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    monkeypatch.setenv("SCENARIO_RETENTION_DAYS", "30")
+    return MongoScenarioRepository(mongomock_motor.AsyncMongoMockClient()["test_database"])
+
+
+async def test_export_includes_archived_scenarios(repository, make_scenario):
+    await repository.db.scenarios.insert_many([make_scenario(i, age_days=60) for i in range(3)])
+    await repository.db.scenarios.insert_many([make_scenario(i, age_days=1) for i in range(3, 5)])
+    await repository.archive_service.archive_old_scenarios(repository.db)
+
+    exported = [scenario async for scenario in repository.export()]
+    assert [s["id"] for s in exported] == [f"scenario-{i}" for i in range(5)]
+    assert exported[0]["scenario"] == "Scenario text 0"
+
+    limited = [s["id"] async for s in repository.export(limit=4)]
+    assert limited == [f"scenario-{i}" for i in range(4)]
+
+    since = datetime.utcnow() - timedelta(days=2)
+    recent = [s["id"] async for s in repository.export(since=since)]
+    assert recent == ["scenario-3", "scenario-4"]
+
+
+async def test_count_spans_both_tiers(repository, make_scenario):
+    await repository.db.scenarios.insert_many([make_scenario(i, age_days=60) for i in range(3)])
+    await repository.db.scenarios.insert_many([
+        make_scenario(i, session_id="session-b", age_days=1) for i in range(3, 5)
+    ])
+    await repository.archive_service.archive_old_scenarios(repository.db)
+
+    assert await repository.count() == 5
+    assert await repository.count("session-a") == 3
+    assert await repository.count("session-b") == 2
+
+
+async def test_history_validator_counts(repository, make_scenario):
+    await repository.db.scenarios.insert_many([make_scenario(i, age_days=1) for i in range(3)])
+
+    _, count = await repository.history_validator(None)
+    assert count == 3
+    _, session_count = await repository.history_validator("session-a")
+    assert session_count == 3
+
+
+async def test_usage_spans_both_tiers(repository, make_scenario, monkeypatch):
+    await repository.db.scenarios.insert_many([
+        make_scenario(0, session_id="expensive", age_days=60, prompt_tokens=50, completion_tokens=200,
+                      latency_ms=300.0, cost_usd=0.01),
+        make_scenario(1, session_id="cheap", age_days=60, prompt_tokens=10, completion_tokens=20,
+                      latency_ms=100.0, cost_usd=0.001),
+        make_scenario(2, session_id="expensive", age_days=1, prompt_tokens=50, completion_tokens=100,
+                      latency_ms=100.0, cost_usd=0.005),
+    ])
+    await repository.archive_service.archive_old_scenarios(repository.db)
+
+    # mongomock has no $unionWith, so evaluate each side of the union with its own
+    # stages and run the remaining stages over the combined documents
+    db = repository.db
+
+    class UnionCursor:
+        def __init__(self, pipeline):
+            self.pipeline = pipeline
+
+        async def to_list(self, length):
+            union_at = next(i for i, stage in enumerate(self.pipeline) if "$unionWith" in stage)
+            union = self.pipeline[union_at]["$unionWith"]
+            hot = await db.scenarios.aggregate(self.pipeline[:union_at]).to_list(length=None)
+            archived = await db[union["coll"]].aggregate(union["pipeline"]).to_list(length=None)
+            combined = db["usage_union"]
+            await combined.delete_many({})
+            await combined.insert_many([{k: v for k, v in d.items() if k != "_id"} for d in hot + archived])
+            return await combined.aggregate(self.pipeline[union_at + 1:]).to_list(length=length)
+
+    class UnionCollection:
+        aggregate = UnionCursor
+
+    class UnionDatabase:
+        scenarios = UnionCollection()
+
+    monkeypatch.setattr(repository, "db", UnionDatabase())
+
+    usage = await repository.usage(None, limit=10)
+
+    assert [u["session_id"] for u in usage] == ["expensive", "cheap"]
+    assert usage[0]["scenario_count"] == 2
+    assert usage[0]["prompt_tokens"] == 100
+    assert usage[0]["completion_tokens"] == 300
+    assert usage[0]["cost_usd"] == pytest.approx(0.015)
+    assert usage[0]["avg_latency_ms"] == pytest.approx(200.0)
+
+    session_usage = await repository.usage("cheap", limit=10)
+    assert [(u["session_id"], u["scenario_count"]) for u in session_usage] == [("cheap", 1)]
+
+    pipeline = repository._usage_pipeline("cheap", limit=10)
+    assert pipeline[0] == {"$match": {"session_id": "cheap"}}
+    assert pipeline[1]["$unionWith"]["pipeline"] == [{"$match": {"session_id": "cheap"}}]
@@ -0,0 +1,66 @@
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip("typer")
+pytest.importorskip("httpx")
+
+import database
+import replay
+
+
+@pytest.mark.parametrize("values, percentile, expected", [
+    ([1, 2, 3, 4, 5], 50, 3),
+    ([1, 2, 3, 4, 5, 6, 7, 8, 9], 50, 5),
+    (list(range(1, 11)), 90, 9),
+    (list(range(1, 101)), 99, 99),
+    (list(range(1, 11)), 100, 10),
+    ([7], 99, 7),
+    ([], 50, 0.0),
+])
+def test_percentile_nearest_rank(values, percentile, expected):
+    assert replay._percentile(values, percentile) == expected
+
+
+def test_schedule_applies_speed_and_max_gap():
+    events = [[0.0, 0, "a"], [2.0, 0, "b"], [3.0, 1, "c"], [3603.0, 1, "d"]]
+
+    assert replay._schedule(events, speed=1.0, max_gap=60.0) == [0.0, 2.0, 3.0, 63.0]
+    assert replay._schedule(events, speed=2.0, max_gap=60.0) == [0.0, 1.0, 1.5, 31.5]
+    assert replay._schedule(events, speed=1.0, max_gap=1.0) == [0.0, 1.0, 2.0, 3.0]
+
+
+async def test_replay_rejects_non_positive_speed(tmp_path):
+    with pytest.raises(replay.typer.BadParameter):
+        await replay._replay(str(tmp_path / "missing.json.gz"), speed=0, max_gap=60.0, with_history=False,
+                             llm_latency=0.0, concurrency=1, target="isolated")
+
+
+async def test_capture_anonymises_sessions_and_records_offsets(tmp_path, monkeypatch, make_scenario):
+    from repositories.sqlite_repository import SQLiteScenarioRepository
+
+    repository = SQLiteScenarioRepository(str(tmp_path / "scenarios.db"))
+    await repository.initialize()
+    for index, session_id in enumerate(["real-session-x", "real-session-y", "real-session-x"]):
+        await repository.insert(make_scenario(index * 2, session_id=session_id))
+
+    async def close():
+        await repository.close()
+
+    monkeypatch.setattr(database, "repository", repository)
+    monkeypatch.setattr(database, "close_database_connection", close)
+    output = tmp_path / "capture.json.gz"
+
+    await replay._capture(str(output), days=None, limit=None)
+
+    with gzip.open(output, "rt", encoding="utf-8") as f:
+        raw = f.read()
+    capture = json.loads(raw)
+    assert capture["sessions"] == 2
+    assert capture["events"] == [
+        [0.0, 0, "What if 0?"],
+        [120.0, 1, "What if 2?"],
+        [240.0, 0, "What if 4?"],
+    ]
+    assert "real-session" not in raw
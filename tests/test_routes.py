@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("emergentintegrations")
+
+from fastapi.testclient import TestClient
+
+import routes.scenarios as scenarios_routes
+from database import get_repository
+from repositories.sqlite_repository import SQLiteScenarioRepository
+from server import app
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = SQLiteScenarioRepository(str(tmp_path / "scenarios.db"))
+    asyncio.run(repository.initialize())
+    yield repository
+    asyncio.run(repository.close())
+
+
+@pytest.fixture
+def client(repository, monkeypatch, make_scenario):
+    counter = iter(range(1000))
+
+    async def fake_generate_scenario(question, session_id=None):
+        return make_scenario(
+            next(counter),
+            session_id=session_id,
+            question=question,
+            prompt_tokens=100,
+            completion_tokens=50,
+            latency_ms=250.0,
+            cost_usd=0.001,
+        )
+
+    monkeypatch.setattr(scenarios_routes.scenario_service, "generate_scenario", fake_generate_scenario)
+    app.dependency_overrides[get_repository] = lambda: repository
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_generate_then_history(client):
+    for question in ("What if cats ruled?", "What if it rained upward?"):
+        response = client.post("/api/scenarios/generate", json={"question": question, "session_id": "session-a"})
+        assert response.status_code == 200
+    client.post("/api/scenarios/generate", json={"question": "What if?", "session_id": "session-b"})
+
+    response = client.get("/api/scenarios/history", params={"session_id": "session-a"})
+
+    assert response.status_code == 200
+    assert [s["question"] for s in response.json()] == ["What if it rained upward?", "What if cats ruled?"]
+    assert "cost_usd" not in response.json()[0]
+
+
+def test_history_conditional_get(client):
+    client.post("/api/scenarios/generate", json={"question": "What if?", "session_id": "session-a"})
+
+    response = client.get("/api/scenarios/history", params={"session_id": "session-a"})
+    etag = response.headers["etag"]
+
+    cached = client.get("/api/scenarios/history", params={"session_id": "session-a"}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    client.post("/api/scenarios/generate", json={"question": "What if again?", "session_id": "session-a"})
+    refreshed = client.get("/api/scenarios/history", params={"session_id": "session-a"}, headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+
+
+def test_usage(client):
+    for _ in range(3):
+        client.post("/api/scenarios/generate", json={"question": "What if?", "session_id": "session-a"})
+
+    response = client.get("/api/scenarios/usage", params={"session_id": "session-a"})
+
+    assert response.status_code == 200
+    assert response.json() == [{
+        "session_id": "session-a",
+        "scenario_count": 3,
+        "prompt_tokens": 300,
+        "completion_tokens": 150,
+        "cost_usd": pytest.approx(0.003),
+        "avg_latency_ms": 250.0,
+    }]
+
+
+def test_live_feed_streams_new_scenarios(client):
+    with client.websocket_connect("/api/scenarios/live") as websocket:
+        client.post("/api/scenarios/generate", json={"question": "What if it snowed?", "session_id": "session-a"})
+
+        message = websocket.receive_json()
+
+    assert message["question"] == "What if it snowed?"
+    assert "session_id" not in message
+
+
+def test_live_feed_releases_closed_clients(client):
+    with client.websocket_connect("/api/scenarios/live"):
+        assert scenarios_routes.live_feed.subscriber_count == 1
+
+    # The handler notices the disconnect without waiting for the next broadcast
+    for _ in range(100):
+        if scenarios_routes.live_feed.subscriber_count == 0:
+            break
+        time.sleep(0.01)
+    assert scenarios_routes.live_feed.subscriber_count == 0
@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("emergentintegrations")
+
+from services.scenario_service import ScenarioGeneratorService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("EMERGENT_LLM_KEY", "test-key")
+    monkeypatch.setenv("MAX_SCENARIO_WORDS", "5")
+    return ScenarioGeneratorService()
+
+
+def test_trim_leaves_short_text_untouched(service):
+    assert service._trim_to_word_limit("One two three", 5) == "One two three"
+
+
+def test_trim_prefers_sentence_boundary(service):
+    assert service._trim_to_word_limit("One two three. Four five six seven", 5) == "One two three."
+
+
+def test_trim_without_sentence_boundary_adds_ellipsis(service):
+    assert service._trim_to_word_limit("One two three four, five six seven", 5) == "One two three four, five..."
+
+
+def test_trim_disabled_with_zero_limit(service):
+    text = "One two three four five six seven"
+    assert service._trim_to_word_limit(text, 0) == text
+
+
+def test_parse_response_enforces_word_limit(service):
+    scenario, mood = service._parse_response("One two three. Four five six seven\n[MOOD: chaotic]")
+    assert scenario == "One two three."
+    assert mood == "chaotic"
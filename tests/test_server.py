@@ -0,0 +1,44 @@
+import importlib
+import sys
+
+import pytest
+
+pytest.importorskip("emergentintegrations")
+
+from fastapi.testclient import TestClient
+
+
+def load_server(monkeypatch, compression):
+    monkeypatch.setenv("RESPONSE_COMPRESSION", compression)
+    monkeypatch.setenv("COMPRESSION_MINIMUM_SIZE", "10")
+    sys.modules.pop("server", None)
+    return importlib.import_module("server")
+
+
+@pytest.fixture(autouse=True)
+def restore_server():
+    yield
+    sys.modules.pop("server", None)
+
+
+def test_unknown_compression_rejected(monkeypatch):
+    with pytest.raises(ValueError):
+        load_server(monkeypatch, "lz4")
+
+
+def test_brotli_requires_package(monkeypatch):
+    monkeypatch.setitem(sys.modules, "brotli_asgi", None)
+    with pytest.raises(ValueError):
+        load_server(monkeypatch, "brotli")
+
+
+@pytest.mark.parametrize("compression, encoding", [("gzip", "gzip"), ("brotli", "br"), ("none", None)])
+def test_response_compression(monkeypatch, compression, encoding):
+    if compression == "brotli":
+        pytest.importorskip("brotli_asgi")
+    server = load_server(monkeypatch, compression)
+
+    response = TestClient(server.app).get("/api/", headers={"Accept-Encoding": "br, gzip"})
+
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") == encoding
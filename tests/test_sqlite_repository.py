@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+
+from repositories.sqlite_repository import SQLiteScenarioRepository
+
+
+@pytest.fixture(params=["file", "memory"])
+def repository(request, tmp_path):
+    path = str(tmp_path / "scenarios.db") if request.param == "file" else ":memory:"
+    repository = SQLiteScenarioRepository(path)
+    asyncio.run(repository.initialize())
+    yield repository
+    asyncio.run(repository.close())
+
+
+async def insert_all(repository, scenarios):
+    for scenario in scenarios:
+        await repository.insert(scenario)
+
+
+async def test_history_is_newest_first_and_paged(repository, make_scenario):
+    await insert_all(repository, [make_scenario(i) for i in range(5)])
+
+    first_page = await repository.history(None, limit=2, skip=0)
+    second_page = await repository.history(None, limit=2, skip=2)
+    last_page = await repository.history(None, limit=2, skip=4)
+
+    assert [s["id"] for s in first_page] == ["scenario-4", "scenario-3"]
+    assert [s["id"] for s in second_page] == ["scenario-2", "scenario-1"]
+    assert [s["id"] for s in last_page] == ["scenario-0"]
+    assert first_page[0]["timestamp"] == make_scenario(4)["timestamp"]
+
+
+async def test_history_filters_by_session(repository, make_scenario):
+    await insert_all(repository, [
+        make_scenario(i, session_id="session-a" if i % 2 else "session-b") for i in range(4)
+    ])
+
+    history = await repository.history("session-a", limit=10, skip=0)
+
+    assert [s["id"] for s in history] == ["scenario-3", "scenario-1"]
+
+
+async def test_count(repository, make_scenario):
+    await insert_all(repository, [
+        make_scenario(i, session_id="session-a" if i < 3 else "session-b") for i in range(5)
+    ])
+
+    assert await repository.count() == 5
+    assert await repository.count("session-a") == 3
+    assert await repository.count("missing") == 0
+
+
+async def test_history_validator(repository, make_scenario):
+    assert await repository.history_validator(None) == (None, 0)
+
+    await insert_all(repository, [
+        make_scenario(i, session_id="session-a" if i < 3 else "session-b") for i in range(5)
+    ])
+
+    assert await repository.history_validator(None) == (make_scenario(4)["timestamp"], 5)
+    assert await repository.history_validator("session-a") == (make_scenario(2)["timestamp"], 3)
+
+
+async def test_usage_totals_ranked_by_cost(repository, make_scenario):
+    await insert_all(repository, [
+        make_scenario(0, "cheap", prompt_tokens=10, completion_tokens=20, latency_ms=100.0, cost_usd=0.001),
+        make_scenario(1, "expensive", prompt_tokens=50, completion_tokens=200, latency_ms=300.0, cost_usd=0.01),
+        make_scenario(2, "expensive", prompt_tokens=50, completion_tokens=100, latency_ms=100.0, cost_usd=0.005),
+        make_scenario(3, "cheap"),
+    ])
+
+    usage = await repository.usage(None, limit=10)
+
+    assert [u["session_id"] for u in usage] == ["expensive", "cheap"]
+    assert usage[0]["scenario_count"] == 2
+    assert usage[0]["prompt_tokens"] == 100
+    assert usage[0]["completion_tokens"] == 300
+    assert usage[0]["cost_usd"] == pytest.approx(0.015)
+    assert usage[0]["avg_latency_ms"] == pytest.approx(200.0)
+    assert usage[1]["scenario_count"] == 2
+    assert usage[1]["prompt_tokens"] == 10
+
+    assert [u["session_id"] for u in await repository.usage("cheap", limit=10)] == ["cheap"]
+    assert len(await repository.usage(None, limit=1)) == 1
+
+
+async def test_export_oldest_first_with_since_and_limit(repository, make_scenario):
+    await insert_all(repository, [make_scenario(i) for i in range(5)])
+
+    async def export(**kwargs):
+        return [scenario["id"] async for scenario in repository.export(**kwargs)]
+
+    assert await export() == [f"scenario-{i}" for i in range(5)]
+    assert await export(limit=2) == ["scenario-0", "scenario-1"]
+    assert await export(since=make_scenario(3)["timestamp"]) == ["scenario-3", "scenario-4"]
+    assert await export(since=make_scenario(1)["timestamp"], limit=2) == ["scenario-1", "scenario-2"]
+
+
+async def test_concurrent_reads_and_writes(tmp_path, make_scenario):
+    repository = SQLiteScenarioRepository(str(tmp_path / "scenarios.db"))
+    await repository.initialize()
+
+    await asyncio.gather(
+        *(repository.insert(make_scenario(i)) for i in range(20)),
+        *(repository.history(None, limit=5, skip=0) for _ in range(20)),
+    )
+
+    assert await repository.count() == 20
+    await repository.close()